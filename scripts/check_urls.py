@@ -3,16 +3,54 @@ import argparse
 import asyncio
 import contextlib
 import csv
+import importlib.util
+import json
 import os
+import random
 import re
+import socket
 import sys
 import time
-from dataclasses import dataclass, asdict
-from typing import Iterable, Optional, Tuple, List, Dict, Any
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import aiohttp
+import numpy as np
 import pandas as pd
 
+# Optional parsers picked up by pandas: Rust-based calamine for Excel and the
+# multi-threaded Arrow reader for CSV; openpyxl / the C parser remain the fallback.
+# pandas only knows the calamine engine from 2.2 on.
+_PANDAS_VERSION = tuple(int(p) for p in re.findall(r"\d+", pd.__version__)[:2])
+EXCEL_ENGINE = (
+    "calamine" if _PANDAS_VERSION >= (2, 2) and importlib.util.find_spec("python_calamine") else None
+)
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else None
+
+try:  # columnar copy of the results for downstream analytics
+    import pyarrow as pa
+    import pyarrow.json as pa_json
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional output
+    pa = None
+
+try:  # fast JSON encoder for the per-URL results stream
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:  # c-ares resolver; aiohttp falls back to threaded getaddrinfo without it
+    import aiodns
+except ImportError:  # pragma: no cover - optional speedup
+    aiodns = None
+
+try:  # libuv event loop; not available on Windows
+    import uvloop
+except ImportError:  # pragma: no cover - optional speedup
+    uvloop = None
+
 # --- Configuration helpers --------------------------------------------------
 
 DEFAULT_INPUT = os.environ.get("URL_INPUT_PATH", "data/combined_master_with_urls.xlsx")
@@ -20,9 +58,12 @@ DEFAULT_SHEET = os.environ.get("URL_INPUT_SHEET", None)
 DEFAULT_URL_COLS = os.environ.get("URL_COLUMNS", None)  # comma-separated
 DEFAULT_OUTPUT_DIR = os.environ.get("URL_OUTPUT_DIR", "artifacts")
 DEFAULT_CONCURRENCY = int(os.environ.get("URL_CONCURRENCY", "100"))
+DEFAULT_PER_HOST = int(os.environ.get("URL_PER_HOST_LIMIT", "6"))
 DEFAULT_TIMEOUT = float(os.environ.get("URL_TIMEOUT", "12"))
 DEFAULT_RETRIES = int(os.environ.get("URL_RETRIES", "2"))
 DEFAULT_ENRICH = os.environ.get("URL_WRITE_ENRICHED", "1") == "1"
+DEFAULT_CACHE = os.environ.get("URL_CACHE_PATH", None)  # ETag/Last-Modified store
+DEFAULT_PROGRESS = os.environ.get("URL_PROGRESS_PATH", None)  # NDJSON checkpoint for resuming
 DEFAULT_USER_AGENT = os.environ.get(
     "URL_USER_AGENT",
     (
@@ -31,13 +72,44 @@ DEFAULT_USER_AGENT = os.environ.get(
     ),
 )
 
+# Rows between explicit flushes of the streamed results file
+RESULTS_FLUSH_EVERY = 100
+
+# Retry back-off (full jitter): sleep uniform(0, min(cap, base * 2**attempt)) seconds
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+# SystemRandom so parallel shards/processes never share a jitter sequence
+_RNG = random.SystemRandom()
+
 # Sharding: shard_index in [0..shard_total-1]
 SHARD_INDEX = int(os.environ.get("URL_SHARD_INDEX", os.environ.get("MATRIX_SHARD", "0")))
 SHARD_TOTAL = int(os.environ.get("URL_SHARD_TOTAL", os.environ.get("MATRIX_TOTAL", "1")))
 
 # --- URL utilities ----------------------------------------------------------
 
-URL_RE = re.compile(r"https?://[^\s]+", re.IGNORECASE)
+URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+
+# Cheap shape check run before any network I/O: scheme, a dotted host, no spaces,
+# no brackets in the authority (a stray "]" or "[" would make urlsplit raise)
+VALID_URL_RE = re.compile(r"^https?://[^\s/?#\[\]]+\.[^\s/?#\[\]]+(?:[/?#]\S*)?$", re.IGNORECASE)
+
+# Errors that will not change on retry: malformed URLs and TLS/certificate failures
+# (ClientSSLError also covers ClientConnectorCertificateError)
+UNRECOVERABLE = (aiohttp.InvalidURL, aiohttp.ClientSSLError)
+ARES_ENOTFOUND = 4  # c-ares status for a name that does not exist
+
+# Statuses some servers return for HEAD while serving GET normally
+HEAD_REJECTED = frozenset({403, 405, 501})
+# At most this many alternative URLs are probed for a broken link
+MAX_SUGGESTION_PROBES = 4
+# Broken/working verdict per HTTP status code, looked up once per result
+BROKEN_BY_STATUS = np.ones(1000, dtype=np.bool_)  # default conservative: broken
+BROKEN_BY_STATUS[200:400] = False  # 2xx/3xx, including 206 from the ranged GET probe
+BROKEN_BY_STATUS[[401, 403, 429]] = False  # reachable but blocked/rate-limited
+BROKEN_BY_STATUS[416] = False  # ranged probe of an empty resource: it exists, it just has no byte 0
+
+# Header for the GET fallback; servers answer 206 (or 200 if they ignore ranges)
+RANGE_PROBE = {"Range": "bytes=0-0"}
 
 
 def normalize_url(u: str) -> Optional[str]:
@@ -51,7 +123,8 @@ def normalize_url(u: str) -> Optional[str]:
     return None
 
 
-@dataclass
+# slots: no per-instance __dict__; frozen: results are never mutated after creation
+@dataclass(slots=True, frozen=True)
 class UrlResult:
     url: str
     status: Optional[int]
@@ -64,6 +137,100 @@ class UrlResult:
     suggested_alternative: Optional[str]
 
 
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either delta-seconds or an HTTP-date
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def is_retryable_status(status: Optional[int]) -> bool:
+    return status is not None and (status == 429 or 500 <= status <= 599)
+
+
+def is_dns_nxdomain(exc: BaseException) -> bool:
+    # NXDOMAIN surfaces as ClientConnectorError wrapping a gaierror (threaded resolver)
+    # or an OSError raised from aiodns' DNSError (async resolver)
+    os_error = getattr(exc, "os_error", None)
+    if isinstance(os_error, socket.gaierror):
+        return os_error.errno == socket.EAI_NONAME
+    cause = getattr(os_error, "__cause__", None)
+    if aiodns is not None and isinstance(cause, aiodns.error.DNSError):
+        return bool(cause.args) and cause.args[0] == ARES_ENOTFOUND
+    return False
+
+
+def url_host(u: str) -> str:
+    # runs on unvalidated URLs (sharding); urlsplit rejects malformed bracketed hosts
+    # such as "https://foo.com]", so fall back to one shared bucket for those
+    try:
+        return urlsplit(u).netloc.lower()
+    except ValueError:
+        return ""
+
+
+def interleave_by_host(urls: List[str]) -> List[str]:
+    # round-robin across hosts, keeping each host's URLs in their original order
+    by_host: Dict[str, List[str]] = {}
+    for u in urls:
+        by_host.setdefault(url_host(u), []).append(u)
+    if len(by_host) <= 1:
+        return list(urls)
+    out: List[str] = []
+    queues = [iter(v) for v in by_host.values()]
+    while queues:
+        alive = []
+        for q in queues:
+            u = next(q, None)
+            if u is not None:
+                out.append(u)
+                alive.append(q)
+        queues = alive
+    return out
+
+
+def result_line(r: UrlResult) -> bytes:
+    # one NDJSON line; fields are read directly rather than through asdict(), which
+    # deep-copies every result
+    record = {
+        "url": r.url,
+        "status": r.status,
+        "reason": r.reason,
+        "method": r.method,
+        "final_url": r.final_url,
+        "elapsed_ms": r.elapsed_ms,
+        "attempts": r.attempts,
+        "is_broken": r.is_broken,
+        "suggested_alternative": r.suggested_alternative,
+    }
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record).encode("utf-8") + b"\n"
+
+
+def invalid_result(url: str) -> UrlResult:
+    return UrlResult(
+        url=url,
+        status=None,
+        reason="invalid_url",
+        method="",
+        final_url=url,
+        elapsed_ms=0,
+        attempts=0,
+        is_broken=True,
+        suggested_alternative=None,
+    )
+
+
 # --- Core checker -----------------------------------------------------------
 
 class UrlChecker:
@@ -71,12 +238,20 @@ class UrlChecker:
         self,
         *,
         concurrency: int = DEFAULT_CONCURRENCY,
+        per_host_limit: int = DEFAULT_PER_HOST,
         timeout: float = DEFAULT_TIMEOUT,
         retries: int = DEFAULT_RETRIES,
         user_agent: str = DEFAULT_USER_AGENT,
         progress_every: int = 200,
+        validators: Optional[Dict[str, Dict[str, str]]] = None,
     ) -> None:
-        self.semaphore = asyncio.Semaphore(concurrency)
+        # admission control: at most `concurrency` checks in flight; resize() can lower
+        # it at runtime and raise it back up to the value the checker was built with
+        self._cond = asyncio.Condition()
+        self._active = 0
+        self.concurrency = concurrency
+        self.max_concurrency = concurrency
+        self.per_host_limit = per_host_limit
         self.timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
         self.retries = retries
         self.headers = {
@@ -88,115 +263,194 @@ class UrlChecker:
             "Connection": "keep-alive",
         }
         self.progress_every = progress_every
+        # url -> {"etag": ..., "last_modified": ...} from a previous run
+        self.validators: Dict[str, Dict[str, str]] = validators if validators is not None else {}
         self._checked = 0
         self._total = 0
 
     async def __aenter__(self):
-        connector = aiohttp.TCPConnector(limit=0, ttl_dns_cache=300)
+        # size the pool to the admission limit so sockets are reused rather than
+        # opened per task; cap per host so one origin cannot take every slot
+        # lookups go through c-ares instead of the executor when aiodns is present;
+        # IPv4 only, which avoids a second (AAAA) query per host
+        resolver = aiohttp.AsyncResolver() if aiodns is not None else None
+        connector = aiohttp.TCPConnector(
+            resolver=resolver,
+            family=socket.AF_INET,
+            limit=self.concurrency,
+            limit_per_host=self.per_host_limit,
+            use_dns_cache=True,
+            ttl_dns_cache=600,
+        )
         self.session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout, connector=connector)
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
         await self.session.close()
 
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        cached = self.validators.get(url)
+        if not cached:
+            return {}
+        headers: Dict[str, str] = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def _remember_validators(self, url: str, resp: aiohttp.ClientResponse) -> None:
+        if not (200 <= resp.status <= 299 or resp.status == 304):
+            return
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            entry = self.validators.setdefault(url, {})
+            if etag:
+                entry["etag"] = etag
+            if last_modified:
+                entry["last_modified"] = last_modified
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self.concurrency)
+            self._active += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._active -= 1
+                self._cond.notify(1)
+
+    async def resize(self, concurrency: int) -> None:
+        # Only shrinks below the opening size: run() starts a fixed pool of
+        # min(concurrency, N) workers and the connector pool is sized to match, so
+        # there is nothing to admit past max_concurrency.
+        async with self._cond:
+            self.concurrency = min(self.max_concurrency, max(1, concurrency))
+            self._cond.notify_all()
+
+    async def _backoff(self, attempt: int, retry_after: Optional[float] = None) -> None:
+        # exponential with full jitter so parallel retries against one host spread out;
+        # honour the server's Retry-After (within the cap) and skip the wait entirely
+        # once the last attempt has failed
+        if attempt >= self.retries:
+            return
+        delay = _RNG.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, BACKOFF_CAP))
+        await asyncio.sleep(delay)
+
     def _classify(self, status: Optional[int], reason: str) -> bool:
-        # True means broken
-        if status is None:
-            # network-level failure
-            return True if ("dns" in reason or "connect" in reason or "ssl" in reason or "timeout" in reason) else True
-        if 200 <= status <= 399:
-            return False
-        if status in {401, 403, 429}:
-            # reachable but blocked/rate-limited → not broken for our purposes
-            return False
-        if status in {404, 410, 451}:
-            return True
-        if 500 <= status <= 599:
+        # True means broken; network-level failures (no status) always are
+        if status is None or not 0 <= status < len(BROKEN_BY_STATUS):
             return True
-        # default conservative
-        return True
+        return bool(BROKEN_BY_STATUS[status])
 
     async def check_one(self, url: str) -> UrlResult:
-        async with self.semaphore:
-            attempts = 0
-            last_exc: Optional[BaseException] = None
-            method_used = "HEAD"
-            start_all = time.perf_counter()
-            final_url = url
-            status: Optional[int] = None
-            reason = ""
-
-            for attempt in range(self.retries + 1):
-                attempts = attempt + 1
-                try:
-                    # First try HEAD
-                    method_used = "HEAD"
-                    async with self.session.head(url, allow_redirects=True) as resp:
-                        status = resp.status
-                        final_url = str(resp.url)
-                        reason = resp.reason or ""
-                        # If HEAD not allowed or unhelpful, try GET
-                        if status in (405, 501) or (status == 200 and resp.headers.get("Content-Length") is None):
-                            method_used = "GET"
-                            async with self.session.get(url, allow_redirects=True) as gresp:
-                                status = gresp.status
-                                final_url = str(gresp.url)
-                                reason = gresp.reason or reason or ""
-                    break  # success path (response obtained)
-                except aiohttp.ClientResponseError as e:
-                    status = e.status
-                    reason = e.message or type(e).__name__
-                    if status in (429,) or 500 <= status <= 599:
-                        await asyncio.sleep(min(5, 0.5 * (2 ** attempt)))
-                        continue
-                    break
-                except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError, aiohttp.ClientConnectorError) as e:
-                    last_exc = e
-                    status = None
-                    reason = type(e).__name__.lower()
-                    await asyncio.sleep(min(5, 0.5 * (2 ** attempt)))
+        attempts = 0
+        last_exc: Optional[BaseException] = None
+        method_used = "HEAD"
+        start_all = time.perf_counter()
+        final_url = url
+        status: Optional[int] = None
+        reason = ""
+        # 304 Not Modified is a 3xx, so an unchanged resource counts as working
+        cond_headers = self._conditional_headers(url)
+
+        for attempt in range(self.retries + 1):
+            attempts = attempt + 1
+            try:
+                # First try HEAD
+                method_used = "HEAD"
+                async with self.session.head(url, headers=cond_headers, allow_redirects=True) as resp:
+                    status = resp.status
+                    final_url = str(resp.url)
+                    reason = resp.reason or ""
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    self._remember_validators(url, resp)
+                    # Only fall back to GET when the server rejects HEAD itself;
+                    # a 2xx/3xx HEAD is already the liveness signal we need
+                    if status in HEAD_REJECTED:
+                        # ask for a single byte: same liveness signal, no body transfer
+                        method_used = "GET"
+                        async with self.session.get(url, headers={**cond_headers, **RANGE_PROBE}, allow_redirects=True) as gresp:
+                            status = gresp.status
+                            final_url = str(gresp.url)
+                            reason = gresp.reason or reason or ""
+                            retry_after = parse_retry_after(gresp.headers.get("Retry-After"))
+                            self._remember_validators(url, gresp)
+                # rate limiting and server errors are transient; anything else is final
+                if is_retryable_status(status) and attempt < self.retries:
+                    await self._backoff(attempt, retry_after)
                     continue
-                except asyncio.TimeoutError as e:
-                    last_exc = e
-                    status = None
-                    reason = "timeout"
-                    await asyncio.sleep(min(5, 0.5 * (2 ** attempt)))
+                break  # success path (response obtained)
+            except aiohttp.TooManyRedirects as e:
+                # subclass of ClientResponseError, so it has to be matched first
+                last_exc = e
+                status = 310  # pseudo
+                reason = "too_many_redirects"
+                break
+            except aiohttp.ClientResponseError as e:
+                status = e.status
+                reason = e.message or type(e).__name__
+                if is_retryable_status(status):
+                    retry_after = parse_retry_after(e.headers.get("Retry-After")) if e.headers else None
+                    await self._backoff(attempt, retry_after)
                     continue
-                except aiohttp.TooManyRedirects as e:
-                    last_exc = e
-                    status = 310  # pseudo
-                    reason = "too_many_redirects"
-                    break
-                except Exception as e:  # noqa: BLE001
-                    last_exc = e
-                    status = None
-                    reason = type(e).__name__.lower()
+                break
+            except UNRECOVERABLE as e:
+                last_exc = e
+                status = None
+                reason = f"unrecoverable:{type(e).__name__.lower()}"
+                break
+            except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError) as e:
+                last_exc = e
+                status = None
+                if is_dns_nxdomain(e):
+                    reason = "unrecoverable:dns_nxdomain"
                     break
+                reason = type(e).__name__.lower()
+                await self._backoff(attempt)
+                continue
+            except asyncio.TimeoutError as e:
+                last_exc = e
+                status = None
+                reason = "timeout"
+                await self._backoff(attempt)
+                continue
+            except Exception as e:  # noqa: BLE001
+                last_exc = e
+                status = None
+                reason = type(e).__name__.lower()
+                break
+
+        elapsed_ms = int((time.perf_counter() - start_all) * 1000)
+        suggested = None
+        if status in {404, 410, 451} or reason in {"too_many_redirects"}:
+            suggested = await self._suggest_alternative(url)
+
+        result = UrlResult(
+            url=url,
+            status=status,
+            # only a handful of distinct values; share one string object per value
+            reason=sys.intern(reason),
+            method=sys.intern(method_used),
+            final_url=final_url,
+            elapsed_ms=elapsed_ms,
+            attempts=attempts,
+            is_broken=self._classify(status, reason),
+            suggested_alternative=suggested,
+        )
 
-            elapsed_ms = int((time.perf_counter() - start_all) * 1000)
-            suggested = None
-            if status in {404, 410, 451} or reason in {"too_many_redirects"}:
-                suggested = await self._suggest_alternative(url)
-
-            result = UrlResult(
-                url=url,
-                status=status,
-                reason=reason,
-                method=method_used,
-                final_url=final_url,
-                elapsed_ms=elapsed_ms,
-                attempts=attempts,
-                is_broken=self._classify(status, reason),
-                suggested_alternative=suggested,
-            )
-
-            # progress logging for Actions log
-            self._checked += 1
-            if self._total and self._checked % self.progress_every == 0:
-                pct = 100.0 * self._checked / self._total
-                print(f"[progress] {self._checked}/{self._total} ({pct:.1f}%) done...", flush=True)
+        # progress logging for Actions log
+        self._checked += 1
+        if self._total and self._checked % self.progress_every == 0:
+            pct = 100.0 * self._checked / self._total
+            print(f"[progress] {self._checked}/{self._total} ({pct:.1f}%) done...", flush=True)
 
-            return result
+        return result
 
     async def _suggest_alternative(self, url: str) -> Optional[str]:
         # minimal, safe, and fast heuristics; no external search
@@ -217,110 +471,262 @@ class UrlChecker:
         except Exception:
             return None
 
-        for cand in candidates:
-            try:
-                async with self.session.head(cand, allow_redirects=True) as resp:
-                    if 200 <= resp.status <= 399:
-                        return str(resp.url)
-                async with self.session.get(cand, allow_redirects=True) as resp:
-                    if 200 <= resp.status <= 399:
-                        return str(resp.url)
-            except Exception:
-                continue
+        # probe candidates concurrently and take the first one that answers 2xx/3xx
+        probes = [asyncio.create_task(self._probe_candidate(c)) for c in candidates[:MAX_SUGGESTION_PROBES]]
+        pending = set(probes)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    found = t.result()
+                    if found:
+                        return found
+            return None
+        finally:
+            for t in pending:
+                t.cancel()
+
+    async def _probe_candidate(self, cand: str) -> Optional[str]:
+        try:
+            async with self.session.head(cand, allow_redirects=True) as resp:
+                if 200 <= resp.status <= 399:
+                    return str(resp.url)
+            # leaving the block releases the response without reading the body
+            # (aiohttp drops a connection with unread payload); the range
+            # header keeps the server from sending more than a byte
+            async with self.session.get(cand, headers=RANGE_PROBE, allow_redirects=True) as resp:
+                if 200 <= resp.status <= 399:
+                    return str(resp.url)
+        except Exception:
+            return None
         return None
 
-    async def run(self, urls: List[str]) -> List[UrlResult]:
-        self._total = len(urls)
-        print(f"[start] checking {self._total} URLs with concurrency={self.semaphore._value}, retries={self.retries}")
-        tasks = [asyncio.create_task(self.check_one(u)) for u in urls]
+    async def run(self, urls: List[str], on_result: Optional[Callable[[UrlResult], None]] = None) -> List[UrlResult]:
+        # Results are handed to on_result as they complete; they are only collected
+        # into the returned list when no callback is given.
+        # Malformed URLs would only burn a connect timeout; report them without a request.
         results: List[UrlResult] = []
-        for coro in asyncio.as_completed(tasks):
-            res = await coro
-            results.append(res)
+        valid: List[str] = []
+        invalid = 0
+        for u in urls:
+            if VALID_URL_RE.match(u):
+                valid.append(u)
+            else:
+                res = invalid_result(u)
+                invalid += 1
+                if on_result:
+                    on_result(res)
+                else:
+                    results.append(res)
+        if invalid:
+            print(f"[info] {invalid} malformed URLs reported as broken without a request")
+        # a sorted sheet lists the same site many rows in a row; spread those out so
+        # a batch does not queue behind limit_per_host while other slots sit idle
+        valid = interleave_by_host(valid)
+        self._total = len(valid)
+        print(f"[start] checking {self._total} URLs with concurrency={self.concurrency}, retries={self.retries}")
+
+        # fixed worker pool fed from a bounded queue: live tasks stay at ~concurrency
+        # no matter how many URLs the shard has, and one consumer hands results on
+        n_workers = min(self.concurrency, len(valid))
+        todo: asyncio.Queue = asyncio.Queue(maxsize=2 * max(1, n_workers))
+        done: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> None:
+            for u in valid:
+                await todo.put(u)
+            for _ in range(n_workers):
+                await todo.put(None)
+
+        async def work() -> None:
+            while True:
+                u = await todo.get()
+                if u is None:
+                    return
+                # workers still pass the admission gate so resize() can shrink the pool
+                async with self._slot():
+                    res = await self.check_one(u)
+                await done.put(res)
+
+        async def consume() -> None:
+            for _ in range(len(valid)):
+                res = await done.get()
+                if on_result:
+                    on_result(res)
+                else:
+                    results.append(res)
+
+        await asyncio.gather(produce(), consume(), *(work() for _ in range(n_workers)))
         print("[done] all checks completed")
         return results
 
 
 # --- Data IO ----------------------------------------------------------------
 
-def read_table(path: str, sheet: Optional[str] = None) -> pd.DataFrame:
+def read_table(path: str, sheet: Optional[str] = None, usecols: Optional[List[str]] = None) -> pd.DataFrame:
     ext = os.path.splitext(path)[1].lower()
     if ext in {".xlsx", ".xls"}:
-        return pd.read_excel(path, sheet_name=sheet)
+        # sheet_name=None would load every sheet into a dict; default to the first one
+        # (the workflow passes an empty --sheet when none is configured)
+        return pd.read_excel(path, sheet_name=sheet or 0, usecols=usecols, engine=EXCEL_ENGINE)
     elif ext in {".csv", ".tsv"}:
         sep = "," if ext == ".csv" else "\t"
-        return pd.read_csv(path, sep=sep)
+        return pd.read_csv(path, sep=sep, usecols=usecols, engine=CSV_ENGINE)
     else:
         raise ValueError(f"Unsupported input extension: {ext}")
 
 
+def _text_columns(df: pd.DataFrame) -> List[str]:
+    # object and string dtypes; pandas >= 3 infers the dedicated "str" dtype for text
+    return list(df.select_dtypes(include=["object", "string"]).columns)
+
+
+def _strip_quotes(s: pd.Series) -> pd.Series:
+    # vectorized normalize_url: trim whitespace, then surrounding quotes
+    return s.str.strip().str.strip('"').str.strip("'")
+
+
 def detect_url_columns(df: pd.DataFrame) -> List[str]:
     name_hits = [c for c in df.columns if re.search(r"url|link", str(c), re.IGNORECASE)]
     if name_hits:
         return name_hits
-    # fallback: scan object columns for http(s) values
+    # fallback: scan text columns for http(s) values
     cols: List[str] = []
-    for c in df.columns:
-        if df[c].dtype == object:
-            sample = df[c].dropna().astype(str).head(200).tolist()
-            if any(s.strip().lower().startswith(("http://", "https://")) for s in sample):
-                cols.append(c)
+    for c in _text_columns(df):
+        sample = df[c].dropna().head(200).astype("string").str.strip().str.lower()
+        if sample.str.startswith(("http://", "https://"), na=False).any():
+            cols.append(c)
     return cols
 
 
 def extract_urls(df: pd.DataFrame, url_cols: Optional[List[str]]) -> Tuple[List[str], Dict[str, List[Tuple[int, str]]]]:
+    # mapping doubles as the de-duplicator: dict keys are unique and keep first-seen order
     mapping: Dict[str, List[Tuple[int, str]]] = {}
-    urls: List[str] = []
     if not url_cols:
         url_cols = detect_url_columns(df)
     if not url_cols:
-        # brute force search across all cells
-        for idx, row in df.iterrows():
-            for c in df.columns:
-                cell = row[c]
-                if isinstance(cell, str):
-                    for m in URL_RE.finditer(cell):
-                        u = normalize_url(m.group(0))
-                        if u:
-                            mapping.setdefault(u, []).append((idx, c))
-                            urls.append(u)
+        # brute force search across all text cells; the regex runs inside pandas and the
+        # hits are put back in row-major order so first-seen order matches a cell scan
+        text_cols = _text_columns(df)
+        found = []
+        for cpos, c in enumerate(text_cols):
+            hits = df[c].reset_index(drop=True).astype("string").str.extractall(f"({URL_RE.pattern})", flags=URL_RE.flags)
+            if hits.empty:
+                continue
+            found.append(
+                pd.DataFrame(
+                    {
+                        "pos": hits.index.get_level_values(0),
+                        "col": cpos,
+                        "match": hits.index.get_level_values(1),
+                        "url": hits[0].to_numpy(),
+                    }
+                )
+            )
+        if found:
+            hits = pd.concat(found, ignore_index=True).sort_values(["pos", "col", "match"], kind="stable")
+            for pos, cpos, u in zip(hits["pos"], hits["col"], _strip_quotes(hits["url"])):
+                mapping.setdefault(u, []).append((df.index[pos], text_cols[cpos]))
     else:
         for c in url_cols:
-            for idx, val in df[c].items():
-                u = normalize_url(val)
-                if u:
-                    mapping.setdefault(u, []).append((idx, c))
-                    urls.append(u)
-    # de-duplicate but keep order
-    seen = set()
-    deduped: List[str] = []
-    for u in urls:
-        if u not in seen:
-            seen.add(u)
-            deduped.append(u)
-    return deduped, mapping
-
-
-def enrich_dataframe(df: pd.DataFrame, mapping: Dict[str, List[Tuple[int, str]]], results: Dict[str, UrlResult]) -> pd.DataFrame:
-    out = df.copy()
-    # For each referenced column, add status and final_url columns
-    touched_cols = {col for pairs in mapping.values() for (_, col) in pairs}
-    for col in sorted(touched_cols):
-        status_col = f"{col}_status"
-        final_col = f"{col}_final_url"
-        broken_col = f"{col}_is_broken"
-        out[status_col] = pd.NA
-        out[final_col] = pd.NA
-        out[broken_col] = pd.NA
+            s = _strip_quotes(df[c].astype("string"))
+            s = s[s.str.lower().str.startswith(("http://", "https://"), na=False)]
+            for idx, u in s.items():
+                mapping.setdefault(u, []).append((idx, c))
+    return list(mapping), mapping
+
+
+def enrich_dataframe(
+    df: pd.DataFrame,
+    mapping: Dict[str, List[Tuple[int, str]]],
+    results: Dict[str, Tuple[Optional[int], str, bool]],
+) -> pd.DataFrame:
+    # Gather (row, value) pairs per referenced column in one pass over the mapping,
+    # then scatter them into object arrays and attach all new columns at once.
+    touched_cols = sorted({col for pairs in mapping.values() for (_, col) in pairs})
+    rows: Dict[str, List[Any]] = {col: [] for col in touched_cols}
+    values: Dict[str, List[Tuple[Optional[int], str, bool]]] = {col: [] for col in touched_cols}
     for url, pairs in mapping.items():
         res = results.get(url)
         if not res:
             continue
         for (idx, col) in pairs:
-            out.at[idx, f"{col}_status"] = res.status
-            out.at[idx, f"{col}_final_url"] = res.final_url
-            out.at[idx, f"{col}_is_broken"] = res.is_broken
-    return out
+            rows[col].append(idx)
+            values[col].append(res)
+
+    extra: Dict[str, np.ndarray] = {}
+    for col in touched_cols:
+        status_arr = np.full(len(df), pd.NA, dtype=object)
+        final_arr = np.full(len(df), pd.NA, dtype=object)
+        broken_arr = np.full(len(df), pd.NA, dtype=object)
+        if rows[col]:
+            pos = df.index.get_indexer(rows[col])
+            status_arr[pos], final_arr[pos], broken_arr[pos] = zip(*values[col])
+        extra[f"{col}_status"] = status_arr
+        extra[f"{col}_final_url"] = final_arr
+        extra[f"{col}_is_broken"] = broken_arr
+    return pd.concat([df, pd.DataFrame(extra, index=df.index)], axis=1)
+
+
+def write_parquet(ndjson_path: str, out_path: str) -> None:
+    # Arrow parses the NDJSON stream natively, so no per-row Python objects are built;
+    # the schema is fixed so shards with e.g. no statuses still agree on types
+    schema = pa.schema(
+        [
+            ("url", pa.string()),
+            ("status", pa.int32()),
+            ("reason", pa.string()),
+            ("method", pa.string()),
+            ("final_url", pa.string()),
+            ("elapsed_ms", pa.int64()),
+            ("attempts", pa.int32()),
+            ("is_broken", pa.bool_()),
+            ("suggested_alternative", pa.string()),
+        ]
+    )
+    if os.path.getsize(ndjson_path) == 0:
+        # Arrow rejects an empty JSON file; a shard can legitimately have no URLs
+        table = schema.empty_table()
+    else:
+        table = pa_json.read_json(ndjson_path, parse_options=pa_json.ParseOptions(explicit_schema=schema))
+    for name in ("reason", "method"):
+        i = table.schema.get_field_index(name)
+        table = table.set_column(i, name, table.column(name).dictionary_encode())
+    pq.write_table(table, out_path, compression="zstd")
+
+
+def load_validators(path: Optional[str]) -> Dict[str, Dict[str, str]]:
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[warn] ignoring unreadable cache {path}: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_validators(path: str, validators: Dict[str, Dict[str, str]]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(validators, f)
+    os.replace(tmp, path)
+
+
+def load_progress(path: Optional[str]) -> Dict[str, UrlResult]:
+    done: Dict[str, UrlResult] = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                res = UrlResult(**json.loads(line))
+            except (ValueError, TypeError):
+                # a crash can leave the last line half-written
+                continue
+            done[res.url] = res
+    return done
 
 
 # --- CLI --------------------------------------------------------------------
@@ -328,7 +734,21 @@ def enrich_dataframe(df: pd.DataFrame, mapping: Dict[str, List[Tuple[int, str]]]
 def shard_list(items: List[str], shard_index: int, shard_total: int) -> List[str]:
     if shard_total <= 1:
         return items
-    return [u for i, u in enumerate(items) if i % shard_total == shard_index]
+    # Partition by host rather than by position so each origin is checked from one
+    # shard and its keep-alive connections and per-host limit are shared. Hosts are
+    # placed largest-first on the least-loaded shard; every shard derives the same
+    # plan from the same full URL list, so no coordination is needed.
+    counts: Dict[str, int] = {}
+    for u in items:
+        host = url_host(u)
+        counts[host] = counts.get(host, 0) + 1
+    load = [0] * shard_total
+    owner: Dict[str, int] = {}
+    for host, n in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])):
+        target = min(range(shard_total), key=lambda i: (load[i], i))
+        owner[host] = target
+        load[target] += n
+    return [u for u in items if owner[url_host(u)] == shard_index]
 
 
 def main(argv: Optional[List[str]] = None) -> int:
@@ -338,23 +758,31 @@ def main(argv: Optional[List[str]] = None) -> int:
     p.add_argument("--url-columns", default=DEFAULT_URL_COLS, help="Comma-separated list of URL column names (optional)")
     p.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="Directory to write result files")
     p.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    p.add_argument("--per-host-limit", type=int, default=DEFAULT_PER_HOST, help="Max simultaneous connections per host")
     p.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
     p.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
     p.add_argument("--shard-index", type=int, default=SHARD_INDEX)
     p.add_argument("--shard-total", type=int, default=SHARD_TOTAL)
+    p.add_argument("--cache-file", default=DEFAULT_CACHE, help="JSON file of ETag/Last-Modified validators reused across runs")
+    p.add_argument("--progress-file", default=DEFAULT_PROGRESS, help="NDJSON checkpoint; URLs already in it are not re-checked")
     p.add_argument("--no-enrich", action="store_true", help="Skip writing enriched Excel with status columns")
     args = p.parse_args(argv)
 
     os.makedirs(args.output_dir, exist_ok=True)
 
     print(f"[config] input={args.input} sheet={args.sheet} url_columns={args.url_columns}")
-    print(f"[config] concurrency={args.concurrency} timeout={args.timeout}s retries={args.retries}")
+    print(f"[config] concurrency={args.concurrency} per_host={args.per_host_limit} timeout={args.timeout}s retries={args.retries}")
     print(f"[config] shard {args.shard_index+1}/{args.shard_total}")
 
-    df = read_table(args.input, args.sheet)
-
     url_cols = [c.strip() for c in args.url_columns.split(",")] if args.url_columns else None
 
+    # The enriched workbook is a copy of the whole sheet; everywhere else only the
+    # URL columns are needed, so skip parsing the rest when they are known.
+    write_enriched = not args.no_enrich and args.shard_index == 0
+    usecols = url_cols if url_cols and not write_enriched else None
+
+    df = read_table(args.input, args.sheet, usecols=usecols)
+
     urls, mapping = extract_urls(df, url_cols)
 
     if not urls:
@@ -365,38 +793,77 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     print(f"[info] total unique URLs: {len(urls)}; this shard will check: {len(shard_urls)}")
 
-    async def _run():
-        async with UrlChecker(concurrency=args.concurrency, timeout=args.timeout, retries=args.retries) as checker:
-            results = await checker.run(shard_urls)
-            return results
-
-    results_list: List[UrlResult] = asyncio.run(_run())
-
-    # Save per-shard results
-    out_all_csv = os.path.join(args.output_dir, f"url_check_results_shard{args.shard_index}.csv")
-    with open(out_all_csv, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(
-            f,
-            fieldnames=[
-                "url",
-                "status",
-                "reason",
-                "method",
-                "final_url",
-                "elapsed_ms",
-                "attempts",
-                "is_broken",
-                "suggested_alternative",
-            ],
-        )
-        w.writeheader()
-        for r in results_list:
-            w.writerow(asdict(r))
-
-    print(f"[write] {out_all_csv}")
+    validators = load_validators(args.cache_file)
+    if args.cache_file:
+        print(f"[info] loaded {len(validators)} cached validators from {args.cache_file}")
+
+    done = load_progress(args.progress_file)
+    resumed = [done[u] for u in shard_urls if u in done]
+    todo = [u for u in shard_urls if u not in done]
+    if args.progress_file:
+        print(f"[info] resuming from {args.progress_file}: {len(resumed)} already checked, {len(todo)} to go")
+
+    # uvloop.run creates its loop directly instead of going through the global event
+    # loop policy, which asyncio deprecates from Python 3.14
+    run_loop = uvloop.run if uvloop is not None else asyncio.run
+
+    async def _run(on_result: Callable[[UrlResult], None]) -> None:
+        async with UrlChecker(
+            concurrency=args.concurrency,
+            per_host_limit=args.per_host_limit,
+            timeout=args.timeout,
+            retries=args.retries,
+            validators=validators,
+        ) as checker:
+            await checker.run(todo, on_result=on_result)
+
+    # Results are written as they complete; only broken rows and, for the enriched
+    # workbook, (status, final_url, is_broken) per URL stay in memory.
+    broken: List[UrlResult] = []
+    status_map: Dict[str, Tuple[Optional[int], str, bool]] = {}
+    out_all = os.path.join(args.output_dir, f"url_check_results_shard{args.shard_index}.ndjson")
+    with contextlib.ExitStack() as stack:
+        f = stack.enter_context(open(out_all, "wb"))
+        progress = stack.enter_context(open(args.progress_file, "ab")) if args.progress_file else None
+        if progress is not None and progress.tell() > 0:
+            # terminate a half-written last line so the first new record isn't glued onto it
+            with open(args.progress_file, "rb") as tail:
+                tail.seek(-1, os.SEEK_END)
+                if tail.read(1) != b"\n":
+                    progress.write(b"\n")
+        written = 0
+
+        def on_result(res: UrlResult, checkpoint: bool = True) -> None:
+            nonlocal written
+            line = result_line(res)
+            f.write(line)
+            written += 1
+            if written % RESULTS_FLUSH_EVERY == 0:
+                f.flush()
+            if progress is not None and checkpoint:
+                progress.write(line)
+                progress.flush()
+            if res.is_broken:
+                broken.append(res)
+            if write_enriched:
+                status_map[res.url] = (res.status, res.final_url, res.is_broken)
+
+        for res in resumed:
+            on_result(res, checkpoint=False)
+        run_loop(_run(on_result))
+
+    print(f"[write] {out_all}")
+
+    if pa is not None:
+        out_parquet = os.path.join(args.output_dir, f"url_check_results_shard{args.shard_index}.parquet")
+        write_parquet(out_all, out_parquet)
+        print(f"[write] {out_parquet}")
+
+    if args.cache_file:
+        save_validators(args.cache_file, validators)
+        print(f"[write] {args.cache_file} ({len(validators)} validators)")
 
     # Broken-only CSV
-    broken = [r for r in results_list if r.is_broken]
     out_broken_csv = os.path.join(args.output_dir, f"broken_urls_shard{args.shard_index}.csv")
     with open(out_broken_csv, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(
@@ -428,11 +895,19 @@ def main(argv: Optional[List[str]] = None) -> int:
     print(f"[write] {out_broken_csv} (broken: {len(broken)})")
 
     # Enriched Excel (optional, only on shard 0 to keep it simple)
-    if not args.no_enrich and args.shard_index == 0:
-        res_map: Dict[str, UrlResult] = {r.url: r for r in results_list}
-        enriched = enrich_dataframe(df, mapping, res_map)
+    if write_enriched:
+        enriched = enrich_dataframe(df, mapping, status_map)
         out_xlsx = os.path.join(args.output_dir, "enriched_with_status.xlsx")
-        with pd.ExcelWriter(out_xlsx, engine="openpyxl") as writer:
+        # xlsxwriter serializes without building openpyxl's cell-object model. Its
+        # constant_memory mode is not usable here: pandas writes column by column
+        # and that mode only keeps the current row, so earlier columns are lost.
+        # strings_to_urls is off so URLs stay plain text: as hyperlinks, xlsxwriter
+        # drops any over 2079 chars and every one past 65530 on a sheet.
+        with pd.ExcelWriter(
+            out_xlsx,
+            engine="xlsxwriter",
+            engine_kwargs={"options": {"strings_to_urls": False}},
+        ) as writer:
             enriched.to_excel(writer, index=False)
         print(f"[write] {out_xlsx}")
 